@@ -1,114 +1,420 @@
+import asyncio
+import codecs
+import hashlib
 import json
-from openai import AzureOpenAI
-from pathlib import Path
+import re
+from collections import Counter
 import os
-import time
-from typing import Dict, List, Optional
+import sys
+
+from openai import AsyncAzureOpenAI
+from pydantic import BaseModel, ConfigDict
+
+from ai_code_guard import cache
+from ai_code_guard.batch_api import run_batch
+from ai_code_guard.config import create_async_client, get_quota, get_settings
+from ai_code_guard.tokens import count_tokens, truncate_to_tokens
+
+# Cache namespace for LLM analyses, keyed by the full request (model, prompts, file content)
+ANALYSIS_CACHE = "llm_analysis"
+
+# Output tokens of an analysis counted against the TPM quota before the response size is known
+ANALYSIS_OUTPUT_TOKENS = 500
+
+# Token budget for file content in a prompt, leaving room for the instructions
+MAX_CONTENT_TOKENS = 3500
+
+# Documentation prompts only use the first MAX_CONTENT_TOKENS tokens, so of large documentation
+# files only the head is read. Dependency files are always read in full, AI packages can be
+# listed anywhere in a lock file.
+LARGE_FILE_BYTES = 256 * 1024
+FILE_HEAD_BYTES = 32 * 1024
+
+# Well-known AI/ML packages (PyPI, npm, ...). Dependency files naming none of them are
+# classified locally without an LLM call.
+AI_PACKAGES = frozenset({
+    "tensorflow", "tensorflow-gpu", "tf-keras", "keras", "torch", "torchvision", "torchaudio",
+    "pytorch-lightning", "lightning", "jax", "flax", "transformers", "sentence-transformers",
+    "diffusers", "peft", "tokenizers", "huggingface-hub", "openai", "anthropic", "langchain",
+    "langchain-core", "langchain-community", "langchain-openai", "langgraph", "llama-index",
+    "llama-cpp-python", "litellm", "cohere", "mistralai", "google-generativeai", "vertexai",
+    "ollama", "tiktoken", "vllm", "spacy", "nltk", "gensim", "scikit-learn", "sklearn",
+    "xgboost", "lightgbm", "catboost", "onnx", "onnxruntime", "opencv-python", "ultralytics",
+    "mediapipe", "timm", "fastai", "mlflow", "wandb", "faiss-cpu", "faiss-gpu", "chromadb",
+    "pinecone-client", "qdrant-client", "weaviate-client", "autogen", "crewai", "aider-chat",
+    "@tensorflow/tfjs", "@huggingface/inference", "@anthropic-ai/sdk", "@langchain/core",
+    "brain.js", "ml5",
+})
+
+
+def _package_pattern(name: str) -> str:
+    """Pattern of a package name, "-" and "_" are interchangeable like in PEP 503 names"""
+    return re.escape(name).replace(r"\-", "[-_]")
+
+
+# Prefixes of AI package families, any "<prefix>-<suffix>" distribution is an AI package
+# (opencv-python-headless, llama-index-core, langchain_openai, ...). Short or generic names like
+# jax or lightning are only matched exactly, jax-rs or the lightning-* crates are unrelated.
+AI_PACKAGE_FAMILIES = frozenset({
+    "tensorflow", "opencv", "langchain", "llama-index", "onnxruntime", "openai", "faiss",
+    "@tensorflow/tfjs",
+})
+
+
+def _alternatives(names: frozenset[str]) -> str:
+    """Regex alternation of package names, longest first"""
+    return "|".join(_package_pattern(name) for name in sorted(names, key=len, reverse=True))
+
+
+# Package names are delimited by anything that cannot be part of a package name, so names that
+# merely end in a known name (mytorch) do not match.
+AI_PACKAGE_RE = re.compile(
+    rf"(?<![\w.@/-])((?:{_alternatives(AI_PACKAGE_FAMILIES)})[-_][\w.-]+"
+    rf"|(?:{_alternatives(AI_PACKAGES)}))(?![\w.-])",
+    re.IGNORECASE,
+)
 
-os.environ['HTTP_PROXY'] = "http://localhost:3128"
-os.environ['HTTPS_PROXY'] = "http://localhost:3128"
+# AI vocabulary for documentation, matched as whole words with an optional plural "s". The words
+# of multi-word terms may be separated by whitespace or a hyphen ("machine-learning").
+# Documentation without any of these terms or AI package names skips the LLM call.
+AI_TERMS = (
+    "ai", "artificial intelligence", "machine learning", "deep learning", "ml", "mlops",
+    "ml model", "neural network", "neural net", "llm", "large language model", "language model",
+    "gpt", "chatgpt", "openai", "azure openai", "anthropic", "claude", "gemini", "llama",
+    "mistral", "transformer", "embedding", "vector store", "vector database",
+    "retrieval-augmented", "rag", "inference", "fine-tune", "fine-tuning", "finetune",
+    "finetuning", "training data", "model training", "pretrained", "pre-trained", "nlp",
+    "natural language processing", "computer vision", "image recognition", "speech recognition",
+    "classifier", "classification model", "predictive model", "recommendation", "generative",
+    "diffusion", "chatbot", "agent", "prompt", "hugging face", "huggingface", "pytorch",
+    "tensorflow", "keras", "scikit-learn",
+)
+AI_TERM_RE = re.compile(
+    r"(?<!\w)(?:"
+    + "|".join(re.escape(term).replace(r"\ ", r"[\s-]") for term in AI_TERMS)
+    + r")s?(?!\w)|"
+    + AI_PACKAGE_RE.pattern,
+    re.IGNORECASE,
+)
 
-endpoint = "https://boschdemov4.openai.azure.com/openai/deployments/hackathon-gpt-4.1/chat/completions?api-version=2025-01-01-preview"
+# Boilerplate documentation that never describes what a project does, matched case-insensitively
+# on the file name without extension (LICENSE, LICENSE.md, license.txt, ...)
+SKIPPED_DOCUMENTATION_NAMES = frozenset({
+    "license", "licence", "copying", "notice", "authors", "contributors", "changelog", "changes",
+    "history", "contributing", "code_of_conduct", "security", "codeowners",
+})
 
-subscription_key = "b7ac5b08650e44f88baf0821f6b40d6e"
-api_version = "2025-01-01-preview"
+class AIMention(BaseModel):
+    """A single AI-related mention found in a file"""
+    model_config = ConfigDict(extra="forbid")
+
+    type: str
+    mention: str
+    context: str
 
-client = AzureOpenAI(
-    api_version=api_version,
-    azure_endpoint=endpoint,
-    api_key=subscription_key,
-)
+
+class AIScanResult(BaseModel):
+    """LLM analysis of a documentation or dependency file"""
+    model_config = ConfigDict(extra="forbid")
+
+    file_path: str
+    has_ai_content: bool
+    ai_mentions: list[AIMention]
+    summary: str
+
+
+# Structured outputs constrain the model to the AIScanResult schema
+SCAN_RESULT_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "AIScanResult",
+        "schema": AIScanResult.model_json_schema(),
+        "strict": True
+    }
+}
 
 
 class AIDocumentationScanner:
     """Scanner for detecting AI-related content in documentation and dependency files"""
 
-    def __init__(self, repo_analysis_path: str, api_key: Optional[str] = None):
+    def __init__(self, repo_analysis_path: str, api_key: str | None = None,
+                 max_concurrency: int = 10, llm_dependency_summary: bool = False):
         self.repo_analysis_path = repo_analysis_path
+        self.max_concurrency = max_concurrency
+        # Ask the LLM to describe dependency files that contain known AI packages
+        self.llm_dependency_summary = llm_dependency_summary
 
-    def scan_for_ai_content(self) -> Dict:
+    async def scan_for_ai_content(self) -> dict:
         """
         Main method to scan both documentation and dependency files for AI-related content
         """
         try:
             # Load the repository analysis
-            with open(self.repo_analysis_path, 'r') as f:
+            with open(self.repo_analysis_path) as f:
                 repo_data = json.load(f)
 
-            results = {
-                "documentation_analysis": {
-                    "files_scanned": 0,
-                    "files_with_ai_content": 0,
-                    "ai_mentions": []
-                },
-                "dependency_analysis": {
-                    "files_scanned": 0,
-                    "files_with_ai_content": 0,
-                    "ai_mentions": []
-                },
-                "summary": {
-                    "total_files_scanned": 0,
-                    "total_ai_files": 0,
-                    "unique_ai_technologies": set()
-                }
-            }
+            # Analyze all files concurrently, at most max_concurrency LLM calls in flight. Files
+            # with identical content (vendored READMEs, copied requirements) share one analysis.
+            print("\nAnalyzing documentation and dependency files...")
+            semaphore = asyncio.Semaphore(self.max_concurrency)
+            analyses: dict[tuple[bool, str], asyncio.Future] = {}
+            async with create_async_client() as client:
+                doc_results, dep_results = await asyncio.gather(
+                    asyncio.gather(*(
+                        self._analyze_deduplicated(semaphore, analyses, client, doc_path,
+                                                   is_dependency=False)
+                        for doc_path in repo_data.get("documentation_files", [])
+                    )),
+                    asyncio.gather(*(
+                        self._analyze_deduplicated(semaphore, analyses, client, dep_path,
+                                                   is_dependency=True)
+                        for dep_path in repo_data.get("dependency_files", [])
+                    )),
+                )
+
+            return self._build_results(doc_results, dep_results)
 
-            # Process documentation files
-            print("\nAnalyzing documentation files...")
-            for doc_path in repo_data.get("documentation_files", []):
-                file_result = self._analyze_single_file(doc_path, is_dependency=False)
-                if file_result:
-                    results["documentation_analysis"]["files_scanned"] += 1
-                    if file_result["has_ai_content"]:
-                        results["documentation_analysis"]["files_with_ai_content"] += 1
-                        results["documentation_analysis"]["ai_mentions"].append(file_result)
-                time.sleep(1)
-
-            # Process dependency files
-            print("\nAnalyzing dependency files...")
-            for dep_path in repo_data.get("dependency_files", []):
-                file_result = self._analyze_single_file(dep_path, is_dependency=True)
-                if file_result:
-                    results["dependency_analysis"]["files_scanned"] += 1
-                    if file_result["has_ai_content"]:
-                        results["dependency_analysis"]["files_with_ai_content"] += 1
-                        results["dependency_analysis"]["ai_mentions"].append(file_result)
-                time.sleep(1)
+        except Exception as e:
+            print(f"Error scanning files: {e}")
+            return {"error": str(e)}
 
-            # Update summary
-            self._update_summary(results)
+    async def scan_for_ai_content_batched(self) -> dict:
+        """
+        Scan documentation and dependency files through the Batch API.
 
-            # Convert set to list for JSON serialization
-            results["summary"]["unique_ai_technologies"] = list(results["summary"]["unique_ai_technologies"])
+        Cheaper and not rate limited, but results may take up to the 24h completion
+        window, so this is meant for CI/offline compliance runs.
+        """
+        try:
+            with open(self.repo_analysis_path) as f:
+                repo_data = json.load(f)
 
-            return results
+            file_paths, local_results, requests = await self._prepare_batch(repo_data)
+
+            print(f"\nSubmitting {len(requests)} files as a batch job "
+                  f"({len(local_results)} cached or classified locally)...")
+            contents = {}
+            if requests:
+                async with create_async_client() as client:
+                    contents = await run_batch(client, requests)
+
+            doc_results, dep_results = [], []
+            for custom_id, file_path in file_paths.items():
+                file_result = local_results.get(custom_id)
+                if file_result is None:
+                    file_result = self._batch_file_result(requests[custom_id],
+                                                          contents.get(custom_id), file_path)
+                if file_result is None:
+                    continue
+                # Report the scanned path, not whatever path the LLM echoed back
+                file_result = {**file_result, "file_path": file_path}
+                if custom_id.startswith("doc-"):
+                    doc_results.append(file_result)
+                else:
+                    dep_results.append(file_result)
+
+            return self._build_results(doc_results, dep_results)
 
         except Exception as e:
             print(f"Error scanning files: {e}")
             return {"error": str(e)}
 
-    def _analyze_single_file(self, file_path: str, is_dependency: bool) -> Optional[Dict]:
+    async def _prepare_batch(self, repo_data: dict) -> tuple[dict[str, str], dict[str, dict],
+                                                              dict[str, dict]]:
+        """
+        Read the files listed in the repository analysis and classify them locally or from the
+        cache where possible.
+
+        Returns:
+            tuple[dict[str, str], dict[str, dict], dict[str, dict]]: The file path, the local or
+            cached result and the chat request still to be sent, each by batch custom id.
+        """
+        file_paths = {}
+        local_results = {}
+        requests = {}
+        for prefix, key, local_check, build_prompt in (
+            ("doc", "documentation_files", self._local_documentation_result,
+             self._documentation_prompt),
+            ("dep", "dependency_files", self._local_dependency_result, self._dependency_prompt),
+        ):
+            for i, file_path in enumerate(repo_data.get(key, [])):
+                content = await asyncio.to_thread(
+                    self._read_file_content, file_path, head_only=(prefix == "doc")
+                )
+                if not content:
+                    continue
+                custom_id = f"{prefix}-{i}"
+                file_paths[custom_id] = file_path
+                file_result = local_check(content, file_path)
+                if file_result is None:
+                    request = self._chat_request(build_prompt(content, file_path))
+                    file_result = cache.load(ANALYSIS_CACHE, cache.request_key(request))
+                    if file_result is None:
+                        requests[custom_id] = request
+                        continue
+                local_results[custom_id] = file_result
+        return file_paths, local_results, requests
+
+    def _batch_file_result(self, request: dict, content: str | None,
+                           file_path: str) -> dict | None:
+        """Parse and cache the batch output of a single file, None if there is no valid output"""
+        if content is None:
+            print(f"No batch result for {file_path}")
+            return None
+        try:
+            file_result = self._parse_analysis(content)
+        except ValueError as e:
+            print(f"Error in LLM analysis of {file_path}: {e}")
+            return None
+        cache.store(ANALYSIS_CACHE, cache.request_key(request), file_result)
+        return file_result
+
+    def _build_results(self, doc_results: list[dict | None],
+                       dep_results: list[dict | None]) -> dict:
+        """Aggregate per-file results into the scan report"""
+        results = {
+            "documentation_analysis": {
+                "files_scanned": 0,
+                "files_with_ai_content": 0,
+                "ai_mentions": []
+            },
+            "dependency_analysis": {
+                "files_scanned": 0,
+                "files_with_ai_content": 0,
+                "ai_mentions": []
+            },
+            "summary": {
+                "total_files_scanned": 0,
+                "total_ai_files": 0,
+                "unique_ai_technologies": []
+            }
+        }
+
+        for analysis, file_results in (("documentation_analysis", doc_results),
+                                       ("dependency_analysis", dep_results)):
+            for file_result in file_results:
+                if file_result:
+                    results[analysis]["files_scanned"] += 1
+                    if file_result["has_ai_content"]:
+                        results[analysis]["files_with_ai_content"] += 1
+                        results[analysis]["ai_mentions"].append(file_result)
+
+        # Update summary
+        self._update_summary(results)
+
+        return results
+
+    async def _analyze_deduplicated(self, semaphore: asyncio.Semaphore,
+                                    analyses: dict[tuple[bool, str], asyncio.Future],
+                                    client: AsyncAzureOpenAI, file_path: str,
+                                    is_dependency: bool) -> dict | None:
+        """Analyze a single file, reusing the analysis of an earlier file with identical content"""
+        content = await asyncio.to_thread(
+            self._read_file_content, file_path, head_only=not is_dependency
+        )
+        if not content:
+            return None
+
+        key = (is_dependency, hashlib.sha256(content.encode("utf-8")).hexdigest())
+        if key not in analyses:
+            analyses[key] = asyncio.ensure_future(
+                self._analyze_bounded(semaphore, client, content, file_path, is_dependency)
+            )
+        file_result = await analyses[key]
+        if file_result is None:
+            return None
+        return {**file_result, "file_path": file_path}
+
+    async def _analyze_bounded(self, semaphore: asyncio.Semaphore, client: AsyncAzureOpenAI,
+                               content: str, file_path: str, is_dependency: bool) -> dict | None:
+        """Analyze a single file while holding a concurrency slot"""
+        async with semaphore:
+            return await self._analyze_single_file(client, content, file_path, is_dependency)
+
+    async def _analyze_single_file(self, client: AsyncAzureOpenAI, content: str, file_path: str,
+                                   is_dependency: bool) -> dict | None:
         """
         Analyze a single file for AI content
         """
         try:
             print(f"Analyzing: {file_path}")
 
-            content = self._read_file_content(file_path)
-            if not content:
-                return None
-
             if is_dependency:
-                return self._check_dependency_content(content, file_path)
-            return self._check_documentation_content(content, file_path)
+                return await self._check_dependency_content(client, content, file_path)
+            return await self._check_documentation_content(client, content, file_path)
 
         except Exception as e:
             print(f"Error analyzing {file_path}: {e}")
             return None
 
-    def _check_documentation_content(self, content: str, file_path: str) -> Dict:
+    async def _check_documentation_content(self, client: AsyncAzureOpenAI, content: str,
+                                           file_path: str) -> dict:
         """Check documentation content for AI-related mentions"""
-        prompt = f"""
+        local_result = self._local_documentation_result(content, file_path)
+        if local_result is not None:
+            return local_result
+        return await self._get_llm_analysis(client, self._documentation_prompt(content, file_path))
+
+    @staticmethod
+    def _local_documentation_result(content: str, file_path: str) -> dict | None:
+        """
+        Return a negative result for boilerplate documentation and documentation without
+        any AI vocabulary. Returns None when the LLM has to analyze the file.
+        """
+        name = os.path.splitext(os.path.basename(file_path))[0].lower()
+        if name in SKIPPED_DOCUMENTATION_NAMES:
+            summary = "Skipped boilerplate documentation"
+        elif not AI_TERM_RE.search(content):
+            summary = "No AI-related terms found"
+        else:
+            return None
+        return {
+            "file_path": file_path,
+            "has_ai_content": False,
+            "ai_mentions": [],
+            "summary": summary
+        }
+
+    async def _check_dependency_content(self, client: AsyncAzureOpenAI, content: str,
+                                        file_path: str) -> dict:
+        """Check dependency file content for AI-related packages"""
+        local_result = self._local_dependency_result(content, file_path)
+        if local_result is not None:
+            return local_result
+        return await self._get_llm_analysis(client, self._dependency_prompt(content, file_path))
+
+    def _local_dependency_result(self, content: str, file_path: str) -> dict | None:
+        """
+        Classify a dependency file against AI_PACKAGES without an LLM call.
+        Returns None when the LLM should describe the file instead.
+        """
+        packages = list(dict.fromkeys(
+            match.lower().replace("_", "-") for match in AI_PACKAGE_RE.findall(content)
+        ))
+        if not packages:
+            return {
+                "file_path": file_path,
+                "has_ai_content": False,
+                "ai_mentions": [],
+                "summary": "No AI-related packages found"
+            }
+        if self.llm_dependency_summary:
+            return None
+        return {
+            "file_path": file_path,
+            "has_ai_content": True,
+            "ai_mentions": [
+                {"type": "library", "mention": package, "context": "AI/ML package dependency"}
+                for package in packages
+            ],
+            "summary": f"AI dependencies found: {', '.join(packages)}"
+        }
+
+    @staticmethod
+    def _documentation_prompt(content: str, file_path: str) -> str:
+        """Build the prompt for a documentation file"""
+        content = truncate_to_tokens(content, MAX_CONTENT_TOKENS)
+        return f"""
         Analyze this documentation file and identify any mentions or indications of AI usage.
         Look for:
         1. Direct mentions of AI, machine learning, neural networks
@@ -118,7 +424,7 @@ class AIDocumentationScanner:
         5. AI-related configurations
 
         File content:
-        {content[:4000]}
+        {content}
 
         Return ONLY a valid JSON response:
         {{
@@ -136,11 +442,13 @@ class AIDocumentationScanner:
         Return ONLY valid JSON, no additional text or markdown formatting.
         """
 
-        return self._get_llm_analysis(prompt)
-
-    def _check_dependency_content(self, content: str, file_path: str) -> Dict:
-        """Check dependency file content for AI-related packages"""
-        prompt = f"""
+    @staticmethod
+    def _dependency_prompt(content: str, file_path: str) -> str:
+        """Build the prompt for a dependency file"""
+        # Only the lines naming AI packages matter, the rest is dropped before truncation
+        ai_lines = [line for line in content.splitlines() if AI_PACKAGE_RE.search(line)]
+        content = truncate_to_tokens("\n".join(ai_lines) or content, MAX_CONTENT_TOKENS)
+        return f"""
         Analyze this dependency file and identify any AI-related packages or libraries.
         Look for:
         1. Machine learning libraries (tensorflow, pytorch, scikit-learn, etc.)
@@ -153,7 +461,7 @@ class AIDocumentationScanner:
         8. Agentic AI 
 
         File content:
-        {content[:4000]}
+        {content}
 
         Return ONLY a valid JSON response:
         {{
@@ -171,28 +479,49 @@ class AIDocumentationScanner:
         Return ONLY valid JSON, no additional text or markdown formatting.
         """
 
-        return self._get_llm_analysis(prompt)
+    @staticmethod
+    def _chat_request(prompt: str) -> dict:
+        """Chat completion parameters shared by live and batch requests"""
+        return {
+            "messages": [
+                {
+                    "role": "system",
+                    "content": "You are an AI content analyzer. Return only valid JSON."
+                },
+                {
+                    "role": "user",
+                    "content": prompt
+                }
+            ],
+            "model": get_settings().deployment,
+            "temperature": 1,
+            "response_format": SCAN_RESULT_FORMAT
+        }
+
+    @staticmethod
+    def _parse_analysis(content: str) -> dict:
+        """Validate the structured analysis returned by the LLM"""
+        return AIScanResult.model_validate_json(content).model_dump()
 
-    def _get_llm_analysis(self, prompt: str) -> Dict:
+    async def _get_llm_analysis(self, client: AsyncAzureOpenAI, prompt: str) -> dict:
         """Get analysis from LLM"""
         try:
-            response = client.chat.completions.create(
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are an AI content analyzer. Return only valid JSON."
-                    },
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ],
-                model="hackathon-gpt-4.1",
-                temperature=1
-            )
-
-            content = response.choices[0].message.content
-            return json.loads(content.strip())
+            request = self._chat_request(prompt)
+            key = cache.request_key(request)
+            cached = cache.load(ANALYSIS_CACHE, key)
+            if cached is not None:
+                return cached
+
+            # Live calls share the deployment's quota with the summarizer
+            prompt_tokens = sum(count_tokens(message["content"]) for message in request["messages"])
+            quota = get_quota(request["model"])
+            await quota.acquire(prompt_tokens + ANALYSIS_OUTPUT_TOKENS)
+            raw_response = await client.chat.completions.with_raw_response.create(**request)
+            quota.update_from_headers(raw_response.headers)
+            response = raw_response.parse()
+            analysis = self._parse_analysis(response.choices[0].message.content)
+            cache.store(ANALYSIS_CACHE, key, analysis)
+            return analysis
 
         except Exception as e:
             print(f"Error in LLM analysis: {e}")
@@ -202,16 +531,20 @@ class AIDocumentationScanner:
                 "summary": f"Error during analysis: {str(e)}"
             }
 
-    def _read_file_content(self, file_path: str) -> str:
-        """Safely read file content"""
+    def _read_file_content(self, file_path: str, head_only: bool = False) -> str:
+        """Safely read file content, with head_only just the first FILE_HEAD_BYTES of large files"""
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                return f.read()
+            with open(file_path, 'rb') as f:
+                if head_only and os.fstat(f.fileno()).st_size > LARGE_FILE_BYTES:
+                    # final=False holds back a multi-byte character cut off at the end of the head
+                    decoder = codecs.getincrementaldecoder('utf-8')()
+                    return decoder.decode(f.read(FILE_HEAD_BYTES), final=False)
+                return f.read().decode('utf-8')
         except Exception as e:
             print(f"Error reading {file_path}: {e}")
             return ""
 
-    def _update_summary(self, results: Dict) -> None:
+    def _update_summary(self, results: dict) -> None:
         """Update the summary section of results"""
         # Calculate totals
         results["summary"]["total_files_scanned"] = (
@@ -223,13 +556,23 @@ class AIDocumentationScanner:
                 results["dependency_analysis"]["files_with_ai_content"]
         )
 
-        # Collect unique AI technologies
+        # Count AI technologies case-insensitively ("PyTorch" and "pytorch" are one technology),
+        # reporting each under its first-seen spelling
+        counts = Counter()
+        names = {}
         for analysis in ["documentation_analysis", "dependency_analysis"]:
             for file_result in results[analysis]["ai_mentions"]:
                 for mention in file_result.get("ai_mentions", []):
-                    results["summary"]["unique_ai_technologies"].add(mention["mention"])
+                    name = mention["mention"].strip()
+                    key = name.lower()
+                    counts[key] += 1
+                    names.setdefault(key, name)
 
-    def save_results(self, results: Dict, output_path: str = "ai_scan_results.json"):
+        results["summary"]["unique_ai_technologies"] = [
+            {"name": names[key], "count": count} for key, count in counts.most_common()
+        ]
+
+    def save_results(self, results: dict, output_path: str = "ai_scan_results.json"):
         """Save scan results to a JSON file"""
         try:
             with open(output_path, 'w') as f:
@@ -239,7 +582,7 @@ class AIDocumentationScanner:
             print(f"Error saving results: {e}")
 
     @staticmethod
-    def print_scan_results(results: Dict):
+    def print_scan_results(results: dict):
         """Print scan results in a readable format"""
         print("\nAI Content Scan Results")
         print("=" * 50)
@@ -287,16 +630,20 @@ class AIDocumentationScanner:
         if results['summary']['unique_ai_technologies']:
             print("\nUnique AI Technologies Found:")
             for tech in results['summary']['unique_ai_technologies']:
-                print(f"- {tech}")
+                print(f"- {tech['name']} ({tech['count']})")
 
 
 # Example usage
 if __name__ == "__main__":
     # Initialize scanner
-    scanner = AIDocumentationScanner('repo_analysis.json')
-
-    # Scan files
-    results = scanner.scan_for_ai_content()
+    scanner = AIDocumentationScanner('repo_analysis.json',
+                                     llm_dependency_summary="--verbose-summary" in sys.argv[1:])
+
+    # Scan files, --batch trades latency for the cheaper Batch API
+    if "--batch" in sys.argv[1:]:
+        results = asyncio.run(scanner.scan_for_ai_content_batched())
+    else:
+        results = asyncio.run(scanner.scan_for_ai_content())
 
     # Print results
     AIDocumentationScanner.print_scan_results(results)
@@ -0,0 +1,68 @@
+import asyncio
+import json
+
+from openai import AsyncAzureOpenAI
+
+FINAL_BATCH_STATUSES = {"completed", "failed", "expired", "cancelled"}
+
+
+async def run_batch(
+    client: AsyncAzureOpenAI,
+    requests: dict[str, dict],
+    poll_interval: float = 10.0,
+    max_poll_interval: float = 300.0,
+) -> dict[str, str]:
+    """
+    Runs chat completion requests through the (Azure) OpenAI Batch API and waits for them.
+
+    Args:
+        client (AsyncAzureOpenAI): Client used to upload the input and poll the job.
+        requests (dict[str, dict]): Chat completion parameters keyed by custom id.
+        poll_interval (float): Initial delay between status checks, doubled after every check.
+        max_poll_interval (float): Upper bound for the delay between status checks.
+
+    Returns:
+        dict[str, str]: Message content keyed by custom id. Requests that failed inside
+        the batch are missing from the result.
+
+    Raises:
+        RuntimeError: If the batch job does not complete.
+    """
+    lines = [
+        json.dumps(
+            {"custom_id": custom_id, "method": "POST", "url": "/chat/completions", "body": body}
+        )
+        for custom_id, body in requests.items()
+    ]
+    input_file = await client.files.create(
+        file=("batch_input.jsonl", "\n".join(lines).encode("utf-8")),
+        purpose="batch",
+    )
+    batch = await client.batches.create(
+        input_file_id=input_file.id,
+        endpoint="/chat/completions",
+        completion_window="24h",
+    )
+
+    # Poll with exponential backoff, jobs usually take minutes to hours
+    delay = poll_interval
+    while batch.status not in FINAL_BATCH_STATUSES:
+        await asyncio.sleep(delay)
+        delay = min(delay * 2, max_poll_interval)
+        batch = await client.batches.retrieve(batch.id)
+
+    if batch.status != "completed" or not batch.output_file_id:
+        raise RuntimeError(f"Batch {batch.id} finished with status '{batch.status}'")
+
+    output = await client.files.content(batch.output_file_id)
+
+    contents = {}
+    for line in output.text.splitlines():
+        if not line.strip():
+            continue
+        record = json.loads(line)
+        response = record.get("response") or {}
+        if response.get("status_code") == 200:
+            contents[record["custom_id"]] = response["body"]["choices"][0]["message"]["content"]
+
+    return contents
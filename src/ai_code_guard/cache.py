@@ -0,0 +1,70 @@
+import contextlib
+import hashlib
+import json
+import logging
+import os
+import tempfile
+from typing import Any
+
+CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "ai_code_guard")
+
+logger = logging.getLogger(__name__)
+
+
+def cache_key(*parts: str) -> str:
+    """Build a content-addressed cache key from the given parts."""
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def request_key(request: dict) -> str:
+    """Cache key of an LLM request, identical requests share a cached response."""
+    return cache_key(json.dumps(request, sort_keys=True))
+
+
+def _cache_path(namespace: str, key: str) -> str | None:
+    # Use AI_CODE_GUARD_CACHE_DIR env variable, an empty value disables the cache
+    cache_dir = os.environ.get("AI_CODE_GUARD_CACHE_DIR", CACHE_DIR)
+    if not cache_dir:
+        return None
+    return os.path.join(cache_dir, namespace, f"{key}.json")
+
+
+def load(namespace: str, key: str) -> Any | None:
+    """Return the cached JSON value for the key, or None on a miss."""
+    path = _cache_path(namespace, key)
+    if path is None:
+        return None
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return None
+
+
+def store(namespace: str, key: str, value: Any) -> None:
+    """Persist a JSON-serializable value under the key, a failed write only loses the entry."""
+    path = _cache_path(namespace, key)
+    if path is None:
+        return
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write to a temp file first so concurrent readers never see a partial entry
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    except OSError as e:
+        logger.warning("Could not write cache entry %s: %s", path, e)
+        return
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(value, f)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        with contextlib.suppress(OSError):
+            os.unlink(tmp_path)
+        logger.warning("Could not write cache entry %s: %s", path, e)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
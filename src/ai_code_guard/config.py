@@ -0,0 +1,135 @@
+import functools
+import logging
+import os
+import threading
+from dataclasses import dataclass
+
+import httpx
+from dotenv import load_dotenv
+from openai import AsyncAzureOpenAI, DefaultAsyncHttpxClient
+
+from ai_code_guard.rate_limit import DeploymentQuota
+
+DEFAULT_ENDPOINT = "https://boschdemov4.openai.azure.com/"
+DEFAULT_API_VERSION = "2025-01-01-preview"
+DEFAULT_DEPLOYMENT = "hackathon-gpt-4.1"
+DEFAULT_PROXY = "http://localhost:3128"
+# Tokens- and requests-per-minute quota of the deployment, requests wait for it up front instead
+# of running into 429s
+DEFAULT_TPM_LIMIT = 100_000
+DEFAULT_RPM_LIMIT = 600
+
+# Keep-alive pool sized for the concurrent scanner and summarizer calls, and a timeout well below
+# the SDK's 10 minute default so a stuck request fails (and is retried) early
+HTTP_LIMITS = httpx.Limits(max_connections=64, max_keepalive_connections=32)
+HTTP_TIMEOUT = httpx.Timeout(120.0, connect=10.0)
+
+# Level of the ai_code_guard loggers, e.g. DEBUG shows the raw LLM responses
+LOG_LEVEL_ENV = "AI_CODE_GUARD_LOG_LEVEL"
+DEFAULT_LOG_LEVEL = "WARNING"
+
+# The SDK retries connection errors, 408/409/429 and 5xx with exponential backoff and jitter,
+# honoring Retry-After
+MAX_RETRIES = 5
+
+
+@dataclass(frozen=True)
+class AzureSettings:
+    """Azure OpenAI connection settings"""
+    api_key: str | None
+    endpoint: str
+    api_version: str
+    deployment: str
+    proxy: str | None
+    tpm_limit: int
+    rpm_limit: int
+
+
+def _positive_int_env(name: str, default: int) -> int:
+    """Read a positive integer from the environment, falling back to the default with a warning."""
+    value = os.environ.get(name)
+    if value is None:
+        return default
+    try:
+        number = int(value)
+    except ValueError:
+        number = 0
+    if number <= 0:
+        logging.getLogger(__name__).warning("Invalid %s %r, using %d", name, value, default)
+        return default
+    return number
+
+
+@functools.lru_cache(maxsize=1)
+def get_settings() -> AzureSettings:
+    """
+    Read the Azure OpenAI settings from the environment (and .env) on first use.
+
+    Uses the same AZURE_API_KEY / AZURE_API_BASE / AZURE_API_VERSION variables as litellm.
+    Requests only go through the proxy when AI_CODE_GUARD_USE_PROXY=1. AZURE_TPM_LIMIT and
+    AZURE_RPM_LIMIT set the deployment's per-minute quota.
+    """
+    load_dotenv()
+    use_proxy = os.environ.get("AI_CODE_GUARD_USE_PROXY") == "1"
+    return AzureSettings(
+        api_key=os.environ.get("AZURE_API_KEY"),
+        endpoint=os.environ.get("AZURE_API_BASE", DEFAULT_ENDPOINT),
+        api_version=os.environ.get("AZURE_API_VERSION", DEFAULT_API_VERSION),
+        deployment=os.environ.get("AZURE_DEPLOYMENT", DEFAULT_DEPLOYMENT),
+        proxy=os.environ.get("AI_CODE_GUARD_PROXY", DEFAULT_PROXY) if use_proxy else None,
+        tpm_limit=_positive_int_env("AZURE_TPM_LIMIT", DEFAULT_TPM_LIMIT),
+        rpm_limit=_positive_int_env("AZURE_RPM_LIMIT", DEFAULT_RPM_LIMIT),
+    )
+
+
+# One quota per deployment for the whole process, so the scanner and the summarizer of
+# concurrent Streamlit sessions draw from the same budget
+_quotas: dict[str, DeploymentQuota] = {}
+_quotas_lock = threading.Lock()
+
+
+def get_quota(deployment: str) -> DeploymentQuota:
+    """Return the process-wide rate limiters of a deployment, created from the settings."""
+    with _quotas_lock:
+        quota = _quotas.get(deployment)
+        if quota is None:
+            settings = get_settings()
+            quota = _quotas[deployment] = DeploymentQuota(settings.tpm_limit, settings.rpm_limit)
+        return quota
+
+
+def configure_logging() -> None:
+    """
+    Set up logging for an entry point, at the level named by AI_CODE_GUARD_LOG_LEVEL.
+
+    An unknown level name falls back to WARNING with a warning instead of failing the start.
+    """
+    load_dotenv()
+    logging.basicConfig()
+    logger = logging.getLogger("ai_code_guard")
+
+    name = os.environ.get(LOG_LEVEL_ENV, DEFAULT_LOG_LEVEL).strip().upper()
+    level = logging.getLevelNamesMapping().get(name)
+    if level is None:
+        logger.warning("Unknown %s %r, using %s", LOG_LEVEL_ENV, name, DEFAULT_LOG_LEVEL)
+        level = logging.getLevelNamesMapping()[DEFAULT_LOG_LEVEL]
+    logger.setLevel(level)
+
+
+def create_http_client(proxy: str | None = None) -> httpx.AsyncClient:
+    """Create the pooled HTTP client an AsyncAzureOpenAI client sends all its requests through."""
+    return DefaultAsyncHttpxClient(limits=HTTP_LIMITS, timeout=HTTP_TIMEOUT, proxy=proxy)
+
+
+def create_async_client() -> AsyncAzureOpenAI:
+    """Create a new Azure OpenAI client from the settings, the caller has to close it."""
+    settings = get_settings()
+    return AsyncAzureOpenAI(
+        api_key=settings.api_key,
+        azure_endpoint=settings.endpoint,
+        api_version=settings.api_version,
+        max_retries=MAX_RETRIES,
+        # Pass the proxy to this client only instead of exporting HTTP(S)_PROXY process-wide
+        http_client=create_http_client(settings.proxy),
+    )
+
@@ -1,11 +1,37 @@
+import json
+
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 # server = "http://localhost:8000"
 server = "http://10.12.246.125:8000"
 
-def query(use_cases: dict):
+# (connect, read) timeouts in seconds, answering a question takes the agent a while
+REQUEST_TIMEOUT = (5, 120)
+
+# Shared session keeps the connection to the agent alive between queries. Only failed connects
+# and 429/503 responses are retried, where the agent did not take the question: every POST adds
+# the question to the session's chat history, and after a read timeout or another server error
+# the agent may have answered it already. Exhausted status retries raise RetryError.
+_retry = Retry(
+    connect=3,
+    read=0,
+    status=3,
+    backoff_factor=0.5,
+    status_forcelist=[429, 503],
+    allowed_methods=frozenset({"POST"}),
+)
+_adapter = HTTPAdapter(pool_connections=10, pool_maxsize=10, max_retries=_retry)
+_session = requests.Session()
+_session.mount("http://", _adapter)
+_session.mount("https://", _adapter)
+
+def query(use_cases: list[dict]):
+    # Compact JSON keeps the prompt small and unambiguous compared to the dict repr
+    use_cases_json = json.dumps(use_cases, separators=(",", ":"), ensure_ascii=False)
     prompt = (
-        f"You get a use cases of a code repository. Is the EU AI Act relevant for this project? Use cases: {use_cases}"
+        f"You get a use cases of a code repository. Is the EU AI Act relevant for this project? Use cases: {use_cases_json}"
     )
     files = {
         "question": (None, prompt),
@@ -32,4 +58,4 @@ def query(use_cases: dict):
         # "Sec-Fetch-Site": "same-site",
     }
 
-    return requests.post(url, headers=headers, files=files)
+    return _session.post(url, headers=headers, files=files, timeout=REQUEST_TIMEOUT)
@@ -1,16 +1,103 @@
+import functools
 import os
 import re
-from typing import Callable
-import zipfile
-import io
+from collections.abc import Callable
 import sys
+import threading
 
-import requests
 import subprocess
 import shutil
 
 REPOS_DIR = "repos"
 
+GITHUB_URL_RE = re.compile(r"^https://github\.com/([\w\-]+)/([\w\-]+)(?:\.git)?/?$")
+
+# Streamlit serves sessions from threads of a single process, so two sessions
+# scanning the same repository must not delete/clone the same folder at once.
+_repo_locks: dict[str, threading.Lock] = {}
+_repo_locks_guard = threading.Lock()
+
+
+def _get_repo_lock(repo_dir: str) -> threading.Lock:
+    """Return the lock guarding a single repository folder."""
+    lock = _repo_locks.get(repo_dir)
+    if lock is None:
+        with _repo_locks_guard:
+            lock = _repo_locks.setdefault(repo_dir, threading.Lock())
+    return lock
+
+
+@functools.lru_cache(maxsize=128)
+def parse_repo_url(url: str) -> tuple[str, str]:
+    """
+    Validates a GitHub repository URL and splits it into owner and repository name.
+
+    Args:
+        url (str): The GitHub repository URL.
+
+    Returns:
+        tuple[str, str]: The repository owner and name.
+
+    Raises:
+        ValueError: If the URL is invalid.
+    """
+    match = GITHUB_URL_RE.match(url)
+    if not match:
+        raise ValueError("Invalid GitHub repository URL.")
+
+    user, repo = match.groups()
+    return user, repo
+
+
+def _git(*args: str) -> str:
+    """Run a git command and return its stripped stdout."""
+    result = subprocess.run(
+        ["git", *args],
+        check=True,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        # Fail fast instead of waiting for credentials on private/missing repos
+        env={**os.environ, "GIT_TERMINAL_PROMPT": "0"},
+    )
+    return result.stdout.decode().strip()
+
+
+def _update_existing_clone(
+    repo_dir: str, clone_url: str, status_callback: Callable[[str], None]
+) -> bool:
+    """
+    Brings an earlier clone of the repository up to date with the remote HEAD.
+
+    Args:
+        repo_dir (str): Folder of the earlier clone.
+        clone_url (str): The git URL of the repository.
+        status_callback (Callable[[str], None]): Receives progress messages.
+
+    Returns:
+        bool: True if the folder now holds the remote HEAD, False if it has to be cloned again.
+    """
+    try:
+        # Repositories are stored by name only, the folder may belong to another owner's fork
+        if _git("-C", repo_dir, "remote", "get-url", "origin") != clone_url:
+            return False
+
+        remote_sha = _git("ls-remote", clone_url, "HEAD").split()[0]
+        if _git("-C", repo_dir, "rev-parse", "HEAD") == remote_sha:
+            status_callback("Repository unchanged, using existing clone.")
+        else:
+            status_callback("Updating existing clone using git...")
+            _git("-C", repo_dir, "fetch", "--depth", "1", "origin", remote_sha)
+            _git("-C", repo_dir, "reset", "--hard", "FETCH_HEAD")
+
+        # Drop files left behind by earlier scans (e.g. aider caches), so the tree matches a
+        # fresh clone
+        _git("-C", repo_dir, "reset", "--hard")
+        _git("-C", repo_dir, "clean", "-ffdx")
+    except (subprocess.CalledProcessError, IndexError):
+        return False
+
+    return True
+
 
 def download_github_repo(url: str, status_callback: Callable[[str], None]) -> str:
     """
@@ -27,35 +114,33 @@ def download_github_repo(url: str, status_callback: Callable[[str], None]) -> st
         ValueError: If the URL is invalid or clone fails.
     """
 
-    # Validate GitHub repo URL
-    pattern = r"^https://github\.com/([\w\-]+)/([\w\-]+)(?:\.git)?/?$"
-    match = re.match(pattern, url)
-    if not match:
-        raise ValueError("Invalid GitHub repository URL.")
+    user, repo = parse_repo_url(url)
 
     # Use REPOS_DIR env variable
     repos_dir = os.environ.get("REPOS_DIR", REPOS_DIR)
     os.makedirs(repos_dir, exist_ok=True)
 
-    user, repo = match.groups()
     repo_dir = os.path.join(repos_dir, f"{repo}")
 
-    if os.path.exists(repo_dir):
-        shutil.rmtree(repo_dir)
-
     clone_url = f"https://github.com/{user}/{repo}.git"
 
-    status_callback("Cloning repository using git...")
+    with _get_repo_lock(os.path.abspath(repo_dir)):
+        # Reuse the clone of an earlier scan, a ls-remote round-trip is much cheaper than a clone
+        if os.path.isdir(os.path.join(repo_dir, ".git")) and _update_existing_clone(
+            repo_dir, clone_url, status_callback
+        ):
+            return repo_dir
 
-    try:
-        subprocess.run(
-            ["git", "clone", "--single-branch", clone_url, repo_dir],
-            check=True,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-        )
-    except subprocess.CalledProcessError as e:
-        raise ValueError(f"Failed to clone repository: {e.stderr.decode().strip()}")
+        if os.path.exists(repo_dir):
+            shutil.rmtree(repo_dir)
+
+        status_callback("Cloning repository using git...")
+
+        try:
+            # Only the current tree of the default branch is scanned, so skip the history
+            _git("clone", "--depth", "1", "--single-branch", clone_url, repo_dir)
+        except subprocess.CalledProcessError as e:
+            raise ValueError(f"Failed to clone repository: {e.stderr.decode().strip()}")
 
     status_callback("Repository cloned successfully.")
 
@@ -1,10 +1,19 @@
 import json
+import os
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
 
+import requests
 import streamlit as st
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
 
+from ai_code_guard.config import configure_logging
 from ai_code_guard.eu_ai_act_agent import query
-from ai_code_guard.github import download_github_repo
-from ai_code_guard.usage_extraction import extract_ai_usage
+from ai_code_guard.github import download_github_repo, parse_repo_url
+from ai_code_guard.summarize_project import summarize
+from ai_code_guard.usage_extraction import extract_ai_usage, get_model
+
+configure_logging()
 
 # Page configuration
 st.set_page_config(page_title="AI Project Compliance Checker", layout="centered")
@@ -14,6 +23,9 @@ st.markdown("_Analyze any public GitHub repo for AI usage and EU AI Act complian
 
 # Input section
 repo_url = st.text_input("Enter GitHub Repository URL:")
+# The project summary only lists the documentation and dependency files for the reader, nothing
+# downstream uses it, so its LLM calls are opt-in
+show_summary = st.checkbox("List documentation and dependency files (extra LLM calls)")
 
 
 # steps = st.container()
@@ -27,34 +39,99 @@ def st_progress_callback(message: str):
         st.markdown(message)
 
 
-def process_repository(repo_url):
-    st.info("Cloning repository...")
-    repo_dir = download_github_repo(repo_url, status_callback=st_progress_callback)
-
-    # summarize(repo_dir, st_progress_callback)
+def container_callback(container) -> Callable[[str], None]:
+    """Progress callback writing into the given container, usable from worker threads."""
 
-    st.info("Detecting AI use cases...")
-    use_cases = extract_ai_usage(repo_dir, st_progress_callback)
+    def callback(message: str):
+        print(message)
+        container.markdown(message)
 
-    if use_cases:
-        for use_case in use_cases:
-            with st.expander(f"{use_case['use_case']}"):
-                description = use_case.get('functionality') or use_case.get('description')
-                if description:
-                    st.markdown(f"{description}")
-                # st.markdown(f"**Code Snippets:** {', '.join(use_case['code_snippets'])}")
+    return callback
 
-        st.info("Checking EU AI Act compliance...")
 
-        query_result = query(use_cases)
+def summarize_into(repo_dir: str, status) -> None:
+    """Summarize the project into its status box."""
+    # The project summary is informational, a failure there does not stop the compliance check
+    try:
+        summarize(repo_dir, container_callback(status))
+    except Exception as e:
+        status.update(label=f"Project summary failed: {e}", state="error")
+    else:
+        status.update(label="Project summarized", state="complete")
+
+
+def process_repository(repo_url, show_summary=False):
+    # Every stage reports its progress messages into its own status box, which collapses
+    # once the stage is done (and is marked as failed if the stage raises)
+
+    # Reject an invalid URL right away instead of after the model warm-up below
+    try:
+        parse_repo_url(repo_url)
+    except ValueError as e:
+        st.error(str(e))
+        return
+
+    # Import aider/litellm and set up the model while git is cloning. Leaving the block waits
+    # for the warm-up; a failure there resurfaces in extract_ai_usage.
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        executor.submit(get_model)
+
+        with st.status("Cloning repository...", expanded=True) as status:
+            repo_dir = download_github_repo(repo_url, status_callback=st_progress_callback)
+            status.update(label="Repository cloned", state="complete", expanded=False)
+
+    # aider changes the working directory while it maps the repository, so the summary running
+    # next to it needs an absolute path
+    repo_dir = os.path.abspath(repo_dir)
+
+    # Summarizing and usage extraction only read the clone, so they run side by side. The worker
+    # threads get the script run context to write into their status boxes.
+    summary_status = st.status("Summarizing project...", expanded=True) if show_summary else None
+    usage_status = st.status("Detecting AI use cases...", expanded=True)
+    with ThreadPoolExecutor(max_workers=2, initializer=add_script_run_ctx,
+                            initargs=(None, get_script_run_ctx())) as executor:
+        if summary_status is not None:
+            executor.submit(summarize_into, repo_dir, summary_status)
+        usage_future = executor.submit(extract_ai_usage, repo_dir, container_callback(usage_status))
+
+        analysis = usage_future.result()
+        use_cases = analysis.get("use_cases") or []
+        if analysis.get("error"):
+            usage_status.update(label="AI use case detection failed", state="error")
+        else:
+            usage_status.update(label=f"Detected {len(use_cases)} AI use cases", state="complete",
+                                expanded=False)
+
+    # Only ask the EU AI Act agent when at least one AI use case was found
+    if not use_cases:
+        if analysis.get("error"):
+            st.error(f"AI usage extraction failed: {analysis['error']}")
+        st.warning("No AI use cases found in the repository.")
+        return
+
+    for use_case in use_cases:
+        with st.expander(f"{use_case.get('name', 'AI use case')}"):
+            description = use_case.get('functionality') or use_case.get('description')
+            if description:
+                st.markdown(f"{description}")
+            # st.markdown(f"**Code Snippets:** {', '.join(use_case['code_snippets'])}")
+
+    with st.status("Checking EU AI Act compliance...") as status:
+        # Covers an unreachable agent, exhausted retries (RetryError) and error responses
+        try:
+            query_result = query(use_cases)
+            query_result.raise_for_status()
+        except requests.exceptions.RequestException as e:
+            status.update(label="EU AI Act compliance check failed", state="error")
+            st.error(f"EU AI Act agent request failed: {e}")
+            return
 
         report = query_result.json()
         print(json.dumps(report, indent=3))
+        status.update(label="EU AI Act compliance checked", state="complete")
 
-        st_progress_callback(report["data"]["message"])
-    else:
-        st.warning("No AI use cases found in the repository.")
+    st_progress_callback(report["data"]["message"])
 
 
 if st.button("Process"):
-    process_repository(repo_url)
+    process_repository(repo_url, show_summary)
@@ -0,0 +1,105 @@
+import asyncio
+import re
+import threading
+import time
+from collections.abc import Mapping
+
+# Durations in rate limit headers, e.g. "20ms", "1s", "6m0s"
+_DURATION_RE = re.compile(r"(\d+(?:\.\d+)?)(ms|s|m|h)")
+_DURATION_UNITS = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+
+# Below this many remaining requests, wait for the server's window to reset
+MIN_REMAINING_REQUESTS = 5
+
+# Wait used when the server reports a low budget but no reset time (Azure OpenAI)
+DEFAULT_RESET_SECONDS = 1.0
+
+
+def parse_duration(value: str) -> float | None:
+    """Parse a rate limit reset header ("6m0s", "20ms" or plain seconds) into seconds."""
+    matches = _DURATION_RE.findall(value)
+    if matches:
+        return sum(float(number) * _DURATION_UNITS[unit] for number, unit in matches)
+    try:
+        return float(value)
+    except ValueError:
+        return None
+
+
+class AsyncRateLimiter:
+    """
+    Token bucket limiting how fast a resource is used from async code.
+
+    The bucket holds up to max_rate units and refills at max_rate units per time_period,
+    so short bursts run at full speed while the long-term rate stays within the limit.
+    The bucket is guarded by a thread lock (never held while waiting), so one limiter can be
+    shared by the event loops of several threads, e.g. concurrent Streamlit sessions.
+    """
+
+    def __init__(self, max_rate: float, time_period: float = 60.0):
+        self.max_rate = max_rate
+        self.time_period = time_period
+        self._level = float(max_rate)
+        self._last_refill = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    async def acquire(self, amount: float = 1.0) -> None:
+        """Wait until amount units are available and take them."""
+        # A request larger than the bucket would never fit, let it through once the bucket is full
+        amount = min(amount, self.max_rate)
+        while True:
+            delay = self._try_acquire(amount)
+            if delay == 0:
+                return
+            await asyncio.sleep(delay)
+
+    def _try_acquire(self, amount: float) -> float:
+        """Take amount units if available, otherwise return how long to wait before trying again."""
+        with self._lock:
+            now = time.monotonic()
+            self._level = min(
+                self.max_rate,
+                self._level + (now - self._last_refill) * self.max_rate / self.time_period,
+            )
+            self._last_refill = now
+
+            if now < self._paused_until:
+                return self._paused_until - now
+            if self._level >= amount:
+                self._level -= amount
+                return 0.0
+            return (amount - self._level) * self.time_period / self.max_rate
+
+    def pause(self, seconds: float) -> None:
+        """Hold back all acquires for the given number of seconds."""
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    def update_from_headers(self, headers: Mapping[str, str]) -> None:
+        """Pause when the server reports that its request budget is nearly used up."""
+        try:
+            remaining = int(headers.get("x-ratelimit-remaining-requests", ""))
+        except ValueError:
+            return
+
+        if remaining < MIN_REMAINING_REQUESTS:
+            reset = parse_duration(headers.get("x-ratelimit-reset-requests", ""))
+            self.pause(reset if reset is not None else DEFAULT_RESET_SECONDS)
+
+
+class DeploymentQuota:
+    """Tokens- and requests-per-minute quota of one model deployment."""
+
+    def __init__(self, tpm_limit: int, rpm_limit: int):
+        self.tokens = AsyncRateLimiter(tpm_limit, time_period=60)
+        self.requests = AsyncRateLimiter(rpm_limit, time_period=60)
+
+    async def acquire(self, tokens: int) -> None:
+        """Wait until one request using the given number of tokens fits into the quota."""
+        await self.requests.acquire()
+        await self.tokens.acquire(tokens)
+
+    def update_from_headers(self, headers: Mapping[str, str]) -> None:
+        """Hold back all requests when the server reports the request budget nearly used up."""
+        self.requests.update_from_headers(headers)
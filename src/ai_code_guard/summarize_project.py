@@ -1,145 +1,402 @@
-from pathlib import Path
-from typing import List, Dict, Callable
+import asyncio
+from collections.abc import Iterator, Callable
 import json
-from openai import AzureOpenAI
+from openai import AsyncAzureOpenAI
 import os
-
-
-os.environ["HTTP_PROXY"] = "http://localhost:3128"
-os.environ["HTTPS_PROXY"] = "http://localhost:3128"
-
-endpoint = "https://boschdemov4.openai.azure.com/openai/deployments/hackathon-gpt-4.1/chat/completions?api-version=2025-01-01-preview"
-
-subscription_key = "b7ac5b08650e44f88baf0821f6b40d6e"
-api_version = "2025-01-01-preview"
-
-client = AzureOpenAI(
-    api_version=api_version,
-    azure_endpoint=endpoint,
-    api_key=subscription_key,
+import re
+import sys
+import time
+
+from ai_code_guard import cache
+from ai_code_guard.batch_api import run_batch
+from ai_code_guard.config import create_async_client, get_quota, get_settings
+from ai_code_guard.tokens import count_path_tokens, count_tokens
+
+SYSTEM_PROMPT = (
+    "You are a repository structure analyzer specialized in identifying documentation and "
+    "dependency files. You should be aware of various naming conventions and variations in how "
+    "these files might be named."
 )
 
+# User prompt around the list of file paths of a batch
+CLASSIFICATION_PROMPT_HEADER = """\
+Given the following list of file paths, identify and categorize them into:
+1. README/Documentation files (including variations like README.md, readme.txt, etc.)
+2. Dependency specification files (including variations like requirements.txt, req.txt, requirements-dev.txt, pyproject.toml, package.json, etc.)
+
+Consider that file names might vary, for example:
+- 'req.txt' or 'requirements-dev.txt' instead of 'requirements.txt'
+- 'readme.rst' or 'README' instead of 'README.md'
+- 'deps.txt' might be a requirements file
+- 'project.toml' might be a pyproject.toml equivalent
+
+Please categorize these files:
+"""
+CLASSIFICATION_PROMPT_FOOTER = """
+Return the results in this JSON format:
+    - "documentation_files": [list of paths],
+    - "dependency_files": [list of paths]
+
+Return ONLY valid JSON, no additional text or markdown formatting.
+"""
+
+# Cache namespace for batch classifications, keyed by the full request (model, prompt, file paths)
+CLASSIFICATION_CACHE = "file_classification"
+
+# Prompt tokens per listed path on top of the path itself ("- " prefix and newline)
+PATH_OVERHEAD_TOKENS = 4
+
+# Progress is reported after this many finished batches or seconds, whichever comes first,
+# so cached runs do not redraw the page once per batch
+PROGRESS_EVERY_BATCHES = 4
+PROGRESS_EVERY_SECONDS = 0.5
+
+# Output tokens for the JSON structure around the classified paths
+RESPONSE_OVERHEAD_TOKENS = 100
+
+# Directories that never contain project documentation or dependency specs, pruned from the walk
+SKIP_DIRS = frozenset({".git", "node_modules", "__pycache__", ".venv", "venv"})
+
+# Binary and asset files can never be documentation or dependency specs,
+# so their paths are dropped before they reach the LLM prompt.
+BINARY_EXTENSIONS = frozenset({
+    ".png", ".jpg", ".jpeg", ".gif", ".bmp", ".ico", ".svg", ".webp", ".tif", ".tiff",
+    ".pdf", ".zip", ".gz", ".tgz", ".bz2", ".xz", ".7z", ".rar", ".jar", ".war",
+    ".so", ".dll", ".dylib", ".exe", ".bin", ".o", ".a", ".class", ".pyc", ".pyd",
+    ".woff", ".woff2", ".ttf", ".otf", ".eot",
+    ".mp3", ".mp4", ".wav", ".avi", ".mov", ".webm",
+    ".pt", ".pth", ".onnx", ".h5", ".pkl", ".npy", ".npz", ".parquet", ".db", ".sqlite",
+})
+
+
+# File names that are classified without asking the LLM, matched on the lowercased base name
+DOCUMENTATION_NAME_RE = re.compile(r"^readme([._-].*)?$|.*\.(md|markdown|rst|adoc)$")
+DEPENDENCY_NAMES = frozenset({
+    "requirements.txt", "pyproject.toml", "setup.py", "setup.cfg", "pipfile", "pipfile.lock",
+    "poetry.lock", "uv.lock", "environment.yml", "environment.yaml", "package.json",
+    "package-lock.json", "yarn.lock", "pnpm-lock.yaml", "cargo.toml", "cargo.lock", "go.mod",
+    "go.sum", "gemfile", "gemfile.lock", "pom.xml", "build.gradle", "build.gradle.kts",
+    "composer.json", "composer.lock",
+})
+DEPENDENCY_NAME_RE = re.compile(r"^(requirements|constraints)([-_.].*)?\.(txt|in)$")
+# Source code is neither documentation nor a dependency spec (setup.py is matched by name first,
+# readme.py or readme_generator.py are code)
+SOURCE_EXTENSIONS = frozenset({
+    ".py", ".pyi", ".ipynb", ".js", ".mjs", ".cjs", ".ts", ".tsx", ".jsx", ".java", ".kt", ".scala",
+    ".go", ".rs", ".c", ".h", ".cc", ".cpp", ".hpp", ".cs", ".rb", ".php", ".swift", ".m", ".r",
+    ".sh", ".bat", ".ps1", ".css", ".scss", ".less", ".html", ".vue", ".svelte", ".sql",
+})
+
+
+def classify_by_name(file_path: str) -> str | None:
+    """
+    Classify a file by its name alone.
+
+    Returns:
+        str | None: "documentation_files" or "dependency_files", "" for files that are
+        neither, or None when the name is ambiguous and the LLM has to decide.
+    """
+    name = os.path.basename(file_path).lower()
+    if name in DEPENDENCY_NAMES or DEPENDENCY_NAME_RE.match(name):
+        return "dependency_files"
+    if os.path.splitext(name)[1] in SOURCE_EXTENSIONS:
+        return ""
+    if DOCUMENTATION_NAME_RE.match(name):
+        return "documentation_files"
+    return None
+
 
 class RepoFileAnalyzer:
-    def __init__(self, api_key=None, batch_size=50):
-        self.batch_size = batch_size
+    def __init__(self, api_key=None, max_input_tokens=6000, max_concurrency=8):
+        # Token budget of the file list in a single request, batches are filled up to it
+        self.max_input_tokens = max_input_tokens
+        # Batches classified in parallel, bounded to stay within the deployment's rate limits
+        self.max_concurrency = max_concurrency
 
     def get_all_files(self, repo_path):
         """Get all files from repository"""
-        repo_path = Path(repo_path)
-        all_files = []
-
-        for path in repo_path.rglob("*"):
-            if path.is_file():
-                all_files.append(str(path))
-
-        return all_files
-
-    def process_batch(self, file_paths: List[str]) -> Dict:
-        """Process a batch of file paths"""
-        # Format file paths as a string
-
+        return list(self._scandir_recursive(str(repo_path)))
+
+    def _scandir_recursive(self, path: str) -> Iterator[str]:
+        """Yield the paths of all files below path, skipping SKIP_DIRS and symlinks"""
+        # DirEntry caches the file type from the directory listing, so no stat() per entry
+        with os.scandir(path) as entries:
+            for entry in entries:
+                if entry.is_symlink():
+                    continue
+                if entry.is_dir(follow_symlinks=False):
+                    if entry.name not in SKIP_DIRS:
+                        yield from self._scandir_recursive(entry.path)
+                elif entry.is_file(follow_symlinks=False):
+                    yield entry.path
+
+    @staticmethod
+    def _chat_request(file_paths: list[str]) -> dict:
+        """Chat completion parameters classifying a batch of paths, shared by live and batch runs"""
         # Format file paths for the prompt
         files_str = "\n".join(f"- {f}" for f in file_paths)
 
-        # Prepare the prompt
-        prompt = f"""
-        Given the following list of file paths, identify and categorize them into:
-        1. README/Documentation files (including variations like README.md, readme.txt, etc.)
-        2. Dependency specification files (including variations like requirements.txt, req.txt, requirements-dev.txt, pyproject.toml, package.json, etc.)
-
-        Consider that file names might vary, for example:
-        - 'req.txt' or 'requirements-dev.txt' instead of 'requirements.txt'
-        - 'readme.rst' or 'README' instead of 'README.md'
-        - 'deps.txt' might be a requirements file
-        - 'project.toml' might be a pyproject.toml equivalent
-
-        Please categorize these files:
-
-        {files_str}
-
-        Return the results in this JSON format:
-            - "documentation_files": [list of paths],
-            - "dependency_files": [list of paths],
-            - "reasoning": "explanation of why certain ambiguous files were classified as they were"
-            
-        Return ONLY valid JSON, no additional text or markdown formatting.
-        """
-
+        # Paths are joined in as-is, never formatted, so braces in file names are harmless
+        prompt = "\n".join((CLASSIFICATION_PROMPT_HEADER, files_str, CLASSIFICATION_PROMPT_FOOTER))
+
+        return {
+            "messages": [
+                {
+                    "role": "system",
+                    "content": SYSTEM_PROMPT,
+                },
+                {"role": "user", "content": prompt},
+            ],
+            "model": get_settings().deployment,
+            "temperature": 0,  # Low temperature for more consistent results
+            "response_format": {"type": "json_object"},
+            # The answer repeats at most every path once
+            "max_tokens": sum(count_path_tokens(f) + PATH_OVERHEAD_TOKENS for f in file_paths)
+            + RESPONSE_OVERHEAD_TOKENS,
+        }
+
+    @staticmethod
+    def _parse_response(response_content: str) -> dict | None:
+        """Parse the classification returned by the LLM, None if it is not a valid classification"""
         try:
-            response = client.chat.completions.create(
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are a repository structure analyzer specialized in identifying documentation and dependency files. You should be aware of various naming conventions and variations in how these files might be named.",
-                    },
-                    {"role": "user", "content": prompt.format(files=files_str)},
-                ],
-                model="hackathon-gpt-4.1",
-                temperature=1,  # Low temperature for more consistent results
-            )
-            # Get the response content
-            response_content = response.choices[0].message.content.strip()
-            return json.loads(response_content)
-
+            result = json.loads(response_content.strip())
         except json.JSONDecodeError as e:
             print(f"Error parsing JSON: {e}")
             print(f"Raw response: {response_content}")
-            return {"documentation_files": [], "dependency_files": []}
+            return None
+
+        # A string in place of a path list would be merged character by character
+        if not isinstance(result, dict) or not all(
+            isinstance(result.get(category), list)
+            for category in ("documentation_files", "dependency_files")
+        ):
+            print(f"Unexpected classification: {response_content}")
+            return None
+        return result
+
+    @staticmethod
+    def _failed_batch(error: str) -> tuple[bool, dict]:
+        """Result of a batch that could not be classified"""
+        return False, {"documentation_files": [], "dependency_files": [], "error": error}
+
+    async def process_batch(self, client: AsyncAzureOpenAI,
+                            file_paths: list[str]) -> tuple[bool, dict]:
+        """Process a batch of file paths, returns whether it succeeded and its classification"""
+        try:
+            request = self._chat_request(file_paths)
+            key = cache.request_key(request)
+            cached = cache.load(CLASSIFICATION_CACHE, key)
+            if cached is not None:
+                return True, cached
+
+            # The deployment's quota is shared by every scan and summary in the process, so
+            # requests wait for it up front instead of running into 429s
+            prompt_tokens = sum(count_tokens(message["content"]) for message in request["messages"])
+            quota = get_quota(request["model"])
+            await quota.acquire(prompt_tokens + request["max_tokens"])
+
+            raw_response = await client.chat.completions.with_raw_response.create(**request)
+            quota.update_from_headers(raw_response.headers)
+            response = raw_response.parse()
+            # Get the response content
+            result = self._parse_response(response.choices[0].message.content)
+            if result is None:
+                return self._failed_batch("Invalid classification in LLM response")
+
+            cache.store(CLASSIFICATION_CACHE, key, result)
+            return True, result
+
         except Exception as e:
-            return f"Error in LLM classification: {str(e)}"
+            # Transient errors were already retried by the client, give up on this batch only
+            return self._failed_batch(f"Error in LLM classification: {str(e)}")
 
-    def analyze_repository(self, repo_path, progress_callback: Callable[[str], None]):
-        """Main method to analyze repository files"""
+    async def _process_bounded(self, semaphore: asyncio.Semaphore, client: AsyncAzureOpenAI,
+                               file_paths: list[str]) -> tuple[bool, dict]:
+        """Process a batch while holding a concurrency slot"""
+        async with semaphore:
+            return await self.process_batch(client, file_paths)
+
+    def _get_batches(self, repo_path) -> tuple[dict, list[list[str]]]:
+        """
+        Collect the repository files worth classifying. Files with obvious names are classified
+        locally, the ambiguous rest is split into batches for the LLM.
+        """
         # Get all files
         all_files = self.get_all_files(repo_path)
 
-        # Skip certain directories and files
-        filtered_files = [
-            f
-            for f in all_files
-            if not any(skip in f for skip in ["/.git/", "/node_modules/", "/__pycache__/", "/.venv/", "/venv/", ".pyc"])
-        ]
+        # Skip binary files, skipped directories are already pruned during the walk
+        filtered_files = [f for f in all_files if os.path.splitext(f)[1].lower() not in BINARY_EXTENSIONS]
+
+        local_results = {"documentation_files": [], "dependency_files": []}
+        ambiguous_files = []
+        for f in filtered_files:
+            category = classify_by_name(f)
+            if category is None:
+                ambiguous_files.append(f)
+            elif category:
+                local_results[category].append(f)
+
+        return local_results, self._split_batches(ambiguous_files)
+
+    def _split_batches(self, file_paths: list[str]) -> list[list[str]]:
+        """Split file paths into batches whose listing stays within max_input_tokens"""
+        batches = []
+        batch = []
+        batch_tokens = 0
+        for file_path in file_paths:
+            path_tokens = count_path_tokens(file_path) + PATH_OVERHEAD_TOKENS
+            if batch and batch_tokens + path_tokens > self.max_input_tokens:
+                batches.append(batch)
+                batch = []
+                batch_tokens = 0
+            batch.append(file_path)
+            batch_tokens += path_tokens
+
+        if batch:
+            batches.append(batch)
+        return batches
+
+    @staticmethod
+    def _merge_results(batch_results: list[tuple[bool, dict]],
+                       progress_callback: Callable[[str], None]) -> dict:
+        """Merge the classifications of all successful batches in batch order"""
+        # Dicts keep insertion order, so they remove duplicates while merging
+        all_results = {"documentation_files": {}, "dependency_files": {}}
+
+        for succeeded, batch_result in batch_results:
+            if not succeeded:
+                progress_callback(f"\nSkipping failed batch: {batch_result['error']}")
+                continue
 
-        # Process files in batches
-        all_results = {"documentation_files": [], "dependency_files": []}
+            # Merge results
+            for category, paths in all_results.items():
+                paths.update(dict.fromkeys(batch_result[category]))
 
-        # Process in batches
-        for i in range(0, len(filtered_files), self.batch_size):
-            batch = filtered_files[i : i + self.batch_size]
-            progress_callback(f"\nProcessing batch {i // self.batch_size + 1} ({len(batch)} files)...")
+        return {category: list(paths) for category, paths in all_results.items()}
 
-            batch_results = self.process_batch(batch)
+    async def analyze_repository(self, repo_path, progress_callback: Callable[[str], None]):
+        """Main method to analyze repository files"""
+        # Process in batches, all batches concurrently with at most max_concurrency LLM calls in
+        # flight
+        local_results, batches = self._get_batches(repo_path)
+        if not batches:
+            return self._merge_results([(True, local_results)], progress_callback)
+        progress_callback(f"\nProcessing {len(batches)} batches of ambiguous files...")
+
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        async with create_async_client() as client:
+            tasks = [
+                asyncio.ensure_future(self._process_bounded(semaphore, client, batch))
+                for batch in batches
+            ]
+
+            # Report batches as they finish instead of after the slowest one
+            last_reported, last_report_time = 0, time.monotonic()
+            for done, finished in enumerate(asyncio.as_completed(tasks), start=1):
+                try:
+                    await finished
+                except Exception:
+                    pass  # Reported when merging below
+
+                now = time.monotonic()
+                if (done == len(batches) or done - last_reported >= PROGRESS_EVERY_BATCHES
+                        or now - last_report_time >= PROGRESS_EVERY_SECONDS):
+                    progress_callback(f"\n{done}/{len(batches)} batches complete")
+                    last_reported, last_report_time = done, now
+
+        # Merge in batch order so the result does not depend on completion order
+        batch_results = [(True, local_results)]
+        for task in tasks:
+            if task.exception() is not None:
+                batch_results.append(self._failed_batch(str(task.exception())))
+            else:
+                batch_results.append(task.result())
+        return self._merge_results(batch_results, progress_callback)
+
+    async def analyze_repository_batch(self, repo_path, progress_callback: Callable[[str], None]):
+        """
+        Analyze repository files through the Batch API.
 
-            # Merge results
-            all_results["documentation_files"].extend(batch_results["documentation_files"])
-            all_results["dependency_files"].extend(batch_results["dependency_files"])
+        Cheaper and not rate limited, but results may take up to the 24h completion
+        window, so this is meant for CLI/offline runs rather than the interactive app.
+        """
+        local_results, batches = self._get_batches(repo_path)
+        if not batches:
+            return self._merge_results([(True, local_results)], progress_callback)
+
+        requests = {f"batch-{i}": self._chat_request(batch) for i, batch in enumerate(batches)}
+        cached_results = {}
+        for custom_id, request in requests.items():
+            cached = cache.load(CLASSIFICATION_CACHE, cache.request_key(request))
+            if cached is not None:
+                cached_results[custom_id] = cached
+
+        uncached_requests = {
+            custom_id: request
+            for custom_id, request in requests.items()
+            if custom_id not in cached_results
+        }
+        progress_callback(
+            f"\nSubmitting {len(uncached_requests)} batches of ambiguous files as a batch job "
+            f"({len(cached_results)} cached)..."
+        )
+        contents = {}
+        if uncached_requests:
+            async with create_async_client() as client:
+                contents = await run_batch(client, uncached_requests)
+
+        batch_results = [(True, local_results)]
+        for custom_id, request in requests.items():
+            if custom_id in cached_results:
+                batch_results.append((True, cached_results[custom_id]))
+                continue
+
+            content = contents.get(custom_id)
+            if content is None:
+                batch_results.append(self._failed_batch(f"No batch result for {custom_id}"))
+                continue
+
+            result = self._parse_response(content)
+            if result is None:
+                batch_results.append(self._failed_batch("Invalid classification in LLM response"))
+                continue
+
+            cache.store(CLASSIFICATION_CACHE, cache.request_key(request), result)
+            batch_results.append((True, result))
+
+        return self._merge_results(batch_results, progress_callback)
+
+
+def summarize(repo_dir, progress_callback: Callable[[str], None], max_input_tokens=6000,
+              mode="live"):
+    # Initialize analyzer
+    analyzer = RepoFileAnalyzer(max_input_tokens=max_input_tokens)
 
-        # Remove duplicates while preserving order
-        all_results["documentation_files"] = list(dict.fromkeys(all_results["documentation_files"]))
-        all_results["dependency_files"] = list(dict.fromkeys(all_results["dependency_files"]))
+    # Analyze repository, mode="batch" trades latency for the cheaper Batch API
+    if mode == "batch":
+        result = asyncio.run(analyzer.analyze_repository_batch(repo_dir, progress_callback))
+    else:
+        result = asyncio.run(analyzer.analyze_repository(repo_dir, progress_callback))
 
-        return all_results
+    # Create result report, paths shown relative to the repository
+    report_parts = ["Analysis Result:"]
 
+    doc_files, dep_files = result["documentation_files"], result["dependency_files"]
 
-def summarize(repo_dir, progress_callback: Callable[[str], None], batch_size=50):
-    # Initialize analyzer
-    analyzer = RepoFileAnalyzer(batch_size=batch_size)
+    report_parts.append(f"\n\n|Documentation Files ({len(doc_files)})|\n|---|\n")
+    report_parts.extend(f"|{os.path.relpath(doc_file, repo_dir)}|\n" for doc_file in doc_files)
 
-    # Analyze repository
-    result = analyzer.analyze_repository(repo_dir, progress_callback)
+    report_parts.append(f"\n\n|Dependency Files ({len(dep_files)})|\n|---|\n")
+    report_parts.extend(f"|{os.path.relpath(dep_file, repo_dir)}|\n" for dep_file in dep_files)
 
-    # Create result report
-    report = "Analysis Result:"
+    progress_callback("".join(report_parts))
 
-    report += f"\n\n|Documentation Files ({len(result['documentation_files'])})|\n|---|\n"
-    for doc_file in result["documentation_files"]:
-        report += f"|{doc_file.split(repo_dir)[-1]}|\n"
+    return result
 
-    report += f"\n\n|Dependency Files ({len(result['dependency_files'])})|\n|---|\n"
-    for dep_file in result["dependency_files"]:
-        report += f"|{dep_file.split(repo_dir)[-1]}|\n"
 
-    progress_callback(report)
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print(f"Usage: {sys.argv[0]} <repo_dir> [--batch]")
+        exit(1)
 
-    return result
+    summarize(sys.argv[1], print, mode="batch" if "--batch" in sys.argv[2:] else "live")
@@ -0,0 +1,44 @@
+import functools
+
+import tiktoken
+
+# Tokenizer of the gpt-4o / gpt-4.1 model family
+ENCODING_NAME = "o200k_base"
+
+
+@functools.lru_cache(maxsize=1)
+def get_encoding() -> tiktoken.Encoding:
+    """Return the shared tokenizer, loaded on first use."""
+    return tiktoken.get_encoding(ENCODING_NAME)
+
+
+def count_tokens(text: str) -> int:
+    """Return the number of tokens the text takes up in a prompt."""
+    return len(get_encoding().encode(text, disallowed_special=()))
+
+
+@functools.lru_cache(maxsize=100_000)
+def count_path_tokens(path: str) -> int:
+    """Return the token count of a file path, cached since paths recur across batches and runs."""
+    return count_tokens(path)
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """
+    Truncates text to at most max_tokens tokens.
+
+    Args:
+        text (str): The text to truncate.
+        max_tokens (int): The token budget.
+
+    Returns:
+        str: The text itself if it fits, otherwise its longest prefix within the budget.
+    """
+    # Every token covers at least one character, so short texts always fit
+    if len(text) <= max_tokens:
+        return text
+
+    tokens = get_encoding().encode(text, disallowed_special=())
+    if len(tokens) <= max_tokens:
+        return text
+    return get_encoding().decode(tokens[:max_tokens])
@@ -1,16 +1,107 @@
+import functools
+import logging
 import os
+import subprocess
 import sys
-from typing import Callable
+from typing import TYPE_CHECKING
+from collections.abc import Callable
 import json  # noqa
 
-from aider.coders import Coder
-from aider.models import Model
 from dotenv import load_dotenv
-from litellm import completion
-from aider.io import InputOutput
+
+from ai_code_guard import cache
+from ai_code_guard.config import get_settings
+
+if TYPE_CHECKING:
+    from aider.models import Model
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
+# Cache namespace for extracted AI usage, keyed by the repository commit and the prompts
+USAGE_CACHE = "ai_usage"
+
+# Prompt sent to the aider coder to describe the AI use cases of a repository
+REPOMAP_PROMPT = """
+# Agent Role and Goal
+You are an expert AI Governance and Legal Tech Analyst. Your primary function is to analyze software project documentation to identify all Artificial Intelligence (AI) use cases. For each identified use case, you must map it to relevant principles and domains typically found in AI legal regulations (such as the EU AI Act). Your goal is to provide a structured analysis that helps software architects and legal teams assess regulatory compliance.
+
+# Core Task: Analysis and Extraction
+Given a the contents of a git repository, you must perform the following steps:
+
+## Identify AI/ML Use Cases
+Scrutinize the provided source code to detect any functionality that involves machine learning, statistical modeling, neural networks, natural language processing, computer vision, generative AI, or any other AI-based decision-making or data processing. It is important to understand which data is processed and what the output is.
+
+## Describe the Use Case
+For each identified instance, provide a concise but complete description. This should include:
+1. Functionality: What does the AI do? (e.g., "recommends products," "detects fraudulent transactions," "generates text summaries").
+2. AI confidence score: How confident are you that this is an AI use case? Rate from 1-10
+3. Input Data: What kind of data does it likely use? (e.g., "user purchase history," "financial transaction data," "article text").
+4. Output Data: What is the output or automated decision? (e.g., "a list of recommended products," "a risk score," "a summary paragraph").
+5. Files involved: List the files that are involved in this AI use case for deeper analysis. Format as a list of file paths.
+
+Just do these tasks and don't ask me for further instructions. Don't ask any questions, like permission to read files. This is highly important as the solution is not interactive
+"""
+
+EXTRACTION_SYSTEM_PROMPT = """\
+You are an expert at extracting structured data from AI analysis reports.
+Extract AI use cases from the provided analysis and return them in the specified JSON format.
+Only include use cases with AI confidence score >= 5.
+Be precise and accurate in your extraction.
+"""
+
+# Intermediate JSON schema (with files_involved for future processing)
+USAGE_JSON_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "codebase": {
+            "type": "string",
+            "description": "Name of the codebase being analyzed"
+        },
+        "use_cases": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "name": {
+                        "type": "string",
+                        "description": "Brief name of the AI use case"
+                    },
+                    "functionality": {
+                        "type": "string",
+                        "description": "Description of what the AI does"
+                    },
+                    "ai_confidence_score": {
+                        "type": "number",
+                        "minimum": 1,
+                        "maximum": 10,
+                        "description": "Confidence score that this is an AI use case (1-10)"
+                    },
+                    "input_data": {
+                        "type": "string",
+                        "description": "Description of input data used by the AI"
+                    },
+                    "output_data": {
+                        "type": "string",
+                        "description": "Description of output data produced by the AI"
+                    },
+                    "files_involved": {
+                        "type": "array",
+                        "items": {
+                            "type": "string"
+                        },
+                        "description": "List of file paths involved in this AI use case"
+                    }
+                },
+                "required": ["name", "functionality", "ai_confidence_score", "input_data", "output_data",
+                             "files_involved"]
+            }
+        }
+    },
+    "required": ["codebase", "use_cases"]
+}
+
 
 def extract_ai_usage(repo_dir: str, status_callback: Callable[[str], None]):
     """Orchestrate the AI usage extraction process.
@@ -20,6 +111,12 @@ def extract_ai_usage(repo_dir: str, status_callback: Callable[[str], None]):
     """
 
     try:
+        key = _usage_cache_key(repo_dir)
+        cached = cache.load(USAGE_CACHE, key) if key else None
+        if cached is not None:
+            status_callback("Repository unchanged since the last extraction, using cached result.")
+            return cached
+
         status_callback("Starting usage extraction...")
 
         # Step 1: Analyze the repository
@@ -29,6 +126,9 @@ def extract_ai_usage(repo_dir: str, status_callback: Callable[[str], None]):
         # Step 2: Extract structured data from analysis
         analysis_data = extract_analysis_data(analysis_result)
 
+        if key and "error" not in analysis_data:
+            cache.store(USAGE_CACHE, key, analysis_data)
+
         status_callback("Usage extraction completed successfully.")
         # print("\nFinal JSON Output:")
         # print(json.dumps(analysis_data, indent=2))
@@ -44,13 +144,52 @@ def extract_ai_usage(repo_dir: str, status_callback: Callable[[str], None]):
         }
 
 
+def _usage_cache_key(repo_dir: str) -> str | None:
+    """Cache key of the repository's current commit, None if it is not a git checkout"""
+    try:
+        result = subprocess.run(
+            ["git", "-C", repo_dir, "rev-parse", "--show-toplevel", "HEAD"],
+            check=True, capture_output=True, text=True,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+    # Paths may contain spaces, so the output is split into lines only
+    lines = result.stdout.splitlines()
+    if len(lines) != 2:
+        return None
+    toplevel, commit = lines
+
+    # A folder inside another checkout would report the enclosing repository's commit
+    if os.path.realpath(toplevel) != os.path.realpath(repo_dir):
+        return None
+    return cache.cache_key(commit, model_name(), REPOMAP_PROMPT, EXTRACTION_SYSTEM_PROMPT)
+
+
+def model_name() -> str:
+    """litellm name of the configured Azure deployment, e.g. "azure/hackathon-gpt-4.1"."""
+    return f"azure/{get_settings().deployment}"
+
+
+@functools.lru_cache(maxsize=1)
+def get_model() -> "Model":
+    """Return the shared aider model, built once per process."""
+    # aider and litellm take seconds to import, so they are loaded on first use
+    from aider.models import Model
+
+    return Model(model_name())
+
+
 def analyze_repomap(repo_dir: str):
     """Extract AI usage information from the codebase.
 
     Returns:
         str: The analysis result from the AI model.
     """
-    model = Model("azure/hackathon-gpt-4.1")
+    from aider.coders import Coder
+    from aider.io import InputOutput
+
+    model = get_model()
     working_dir = os.getcwd()
 
     try:
@@ -62,26 +201,7 @@ def analyze_repomap(repo_dir: str):
 
         # This will execute one instruction on those files and then return
         # coder.run("what is this code doing?")
-        result = coder.run("""
-        # Agent Role and Goal
-        You are an expert AI Governance and Legal Tech Analyst. Your primary function is to analyze software project documentation to identify all Artificial Intelligence (AI) use cases. For each identified use case, you must map it to relevant principles and domains typically found in AI legal regulations (such as the EU AI Act). Your goal is to provide a structured analysis that helps software architects and legal teams assess regulatory compliance.
-    
-        # Core Task: Analysis and Extraction
-        Given a the contents of a git repository, you must perform the following steps:
-    
-        ## Identify AI/ML Use Cases
-        Scrutinize the provided source code to detect any functionality that involves machine learning, statistical modeling, neural networks, natural language processing, computer vision, generative AI, or any other AI-based decision-making or data processing. It is important to understand which data is processed and what the output is.
-    
-        ## Describe the Use Case
-        For each identified instance, provide a concise but complete description. This should include:
-        1. Functionality: What does the AI do? (e.g., "recommends products," "detects fraudulent transactions," "generates text summaries").
-        2. AI confidence score: How confident are you that this is an AI use case? Rate from 1-10
-        3. Input Data: What kind of data does it likely use? (e.g., "user purchase history," "financial transaction data," "article text").
-        4. Output Data: What is the output or automated decision? (e.g., "a list of recommended products," "a risk score," "a summary paragraph").
-        5. Files involved: List the files that are involved in this AI use case for deeper analysis. Format as a list of file paths.
-    
-        Just do these tasks and don't ask me for further instructions. Don't ask any questions, like permission to read files. This is highly important as the solution is not interactive
-        """)
+        result = coder.run(REPOMAP_PROMPT)
 
         return result
     finally:
@@ -99,67 +219,15 @@ def extract_analysis_data(analysis: str):
         dict: The intermediate structured AI usage information.
     """
 
-    # Define the intermediate JSON schema (with files_involved for future processing)
-    json_schema = {
-        "type": "object",
-        "properties": {
-            "codebase": {
-                "type": "string",
-                "description": "Name of the codebase being analyzed"
-            },
-            "use_cases": {
-                "type": "array",
-                "items": {
-                    "type": "object",
-                    "properties": {
-                        "name": {
-                            "type": "string",
-                            "description": "Brief name of the AI use case"
-                        },
-                        "functionality": {
-                            "type": "string",
-                            "description": "Description of what the AI does"
-                        },
-                        "ai_confidence_score": {
-                            "type": "number",
-                            "minimum": 1,
-                            "maximum": 10,
-                            "description": "Confidence score that this is an AI use case (1-10)"
-                        },
-                        "input_data": {
-                            "type": "string",
-                            "description": "Description of input data used by the AI"
-                        },
-                        "output_data": {
-                            "type": "string",
-                            "description": "Description of output data produced by the AI"
-                        },
-                        "files_involved": {
-                            "type": "array",
-                            "items": {
-                                "type": "string"
-                            },
-                            "description": "List of file paths involved in this AI use case"
-                        }
-                    },
-                    "required": ["name", "functionality", "ai_confidence_score", "input_data", "output_data",
-                                 "files_involved"]
-                }
-            }
-        },
-        "required": ["codebase", "use_cases"]
-    }
+    from litellm import completion
 
     # Use LLM with structured output
     response = completion(
-        model="azure/hackathon-gpt-4.1",
+        model=model_name(),
         messages=[
             {
                 "role": "system",
-                "content": """You are an expert at extracting structured data from AI analysis reports. 
-                Extract AI use cases from the provided analysis and return them in the specified JSON format.
-                Only include use cases with AI confidence score >= 5.
-                Be precise and accurate in your extraction."""
+                "content": EXTRACTION_SYSTEM_PROMPT
             },
             {
                 "role": "user",
@@ -167,25 +235,29 @@ def extract_analysis_data(analysis: str):
             }
         ],
         temperature=0.1,
+        # Constrain the model to the schema so the response always decodes
         response_format={
-            "type": "json_object",
-            "schema": json_schema
+            "type": "json_schema",
+            "json_schema": {
+                "name": "ai_usage",
+                "schema": USAGE_JSON_SCHEMA
+            }
         }
     )
 
-    # Debug: Print the raw response
     raw_content = response.choices[0].message.content
-    print(f"Debug - Raw LLM response: {raw_content}")
+    logger.debug("Raw LLM response: %s", raw_content)
 
     # Parse the JSON response
     try:
         structured_data = json.loads(raw_content)
     except json.decoder.JSONDecodeError:
-        print(f"Error decoding JSON: {raw_content}")
-        structured_data = []
-    print(f"Debug - Parsed structured data type: {type(structured_data)}")
-    print(
-        f"Debug - Structured data keys: {structured_data.keys() if isinstance(structured_data, dict) else 'Not a dict'}")
+        logger.error("Error decoding JSON: %s", raw_content)
+        structured_data = {"codebase": "", "use_cases": [], "error": "Invalid JSON in LLM response"}
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Parsed structured data type: %s", type(structured_data))
+        logger.debug("Structured data keys: %s",
+                     list(structured_data) if isinstance(structured_data, dict) else "Not a dict")
 
     return structured_data
 
@@ -194,6 +266,10 @@ if __name__ == "__main__":
     """Main function to execute the usage extraction."""
     import json
 
+    from ai_code_guard.config import configure_logging
+
+    configure_logging()
+
     print("Starting usage extraction...")
     structured_data = extract_ai_usage(sys.argv[1])
 
@@ -0,0 +1,59 @@
+import pytest
+
+from ai_code_guard.ai_documentation_scanner import (
+    AI_PACKAGE_RE,
+    AI_TERM_RE,
+    AIDocumentationScanner,
+)
+
+
+@pytest.mark.parametrize(
+    ("content", "packages"),
+    [
+        ("torch==2.3.0", ["torch"]),
+        ("opencv-python-headless==4.9.0.80", ["opencv-python-headless"]),
+        ("langchain-anthropic>=0.1", ["langchain-anthropic"]),
+        ("llama-index-core", ["llama-index-core"]),
+        ("tensorflow-cpu", ["tensorflow-cpu"]),
+        ("onnxruntime-gpu~=1.17", ["onnxruntime-gpu"]),
+        ("openai-whisper", ["openai-whisper"]),
+        ("langchain_openai", ["langchain_openai"]),
+        ('"@tensorflow/tfjs-node": "^4.0.0"', ["@tensorflow/tfjs-node"]),
+        ("lightning==2.2.0", ["lightning"]),
+        ("jax[cuda12]", ["jax"]),
+        ("mytorch==1.0", []),
+        ("requests\nnumpy", []),
+        ("jax-rs", []),
+        ('lightning-invoice = "0.0.118"', []),
+        ("flax-cli==1.0", []),
+        ("onnx-simplifier", []),
+    ],
+)
+def test_ai_package_re(content, packages):
+    assert AI_PACKAGE_RE.findall(content) == packages
+
+
+def test_local_dependency_result_normalizes_package_names():
+    scanner = AIDocumentationScanner("repo_analysis.json")
+
+    result = scanner._local_dependency_result("langchain_openai\nLangchain-OpenAI\n", "req.txt")
+
+    assert result["has_ai_content"]
+    assert [mention["mention"] for mention in result["ai_mentions"]] == ["langchain-openai"]
+
+
+@pytest.mark.parametrize(
+    ("text", "has_ai_term"),
+    [
+        ("Uses ML to predict customer churn.", True),
+        ("An MLOps toolkit.", True),
+        ("A machine-learning pipeline for sensor data.", True),
+        ("Deep-learning models for image segmentation.", True),
+        ("Built on neural-networks.", True),
+        ("Fine-tuning scripts.", True),
+        ("A simple HTML parser.", False),
+        ("A todo list app.", False),
+    ],
+)
+def test_ai_term_re(text, has_ai_term):
+    assert bool(AI_TERM_RE.search(text)) == has_ai_term
@@ -0,0 +1,77 @@
+import pytest
+
+from ai_code_guard import rate_limit
+from ai_code_guard.rate_limit import DEFAULT_RESET_SECONDS, AsyncRateLimiter, parse_duration
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(rate_limit, "time", fake)
+    return fake
+
+
+@pytest.mark.parametrize(
+    ("value", "seconds"),
+    [
+        ("20ms", 0.02),
+        ("1s", 1.0),
+        ("2.5s", 2.5),
+        ("6m0s", 360.0),
+        ("1m30s", 90.0),
+        ("1h", 3600.0),
+        ("1.5", 1.5),
+        ("", None),
+        ("soon", None),
+    ],
+)
+def test_parse_duration(value, seconds):
+    assert parse_duration(value) == seconds
+
+
+# Steps of (seconds passed, amount taken, expected delay) on a bucket of 10 units per minute,
+# which refills one unit every 6 seconds
+@pytest.mark.parametrize(
+    "steps",
+    [
+        [(0, 10, 0.0)],
+        [(0, 10, 0.0), (0, 1, 6.0)],
+        [(0, 10, 0.0), (3, 1, 3.0)],
+        [(0, 10, 0.0), (6, 1, 0.0)],
+        [(0, 4, 0.0), (0, 4, 0.0), (0, 4, 12.0)],
+        [(0, 10, 0.0), (600, 10, 0.0), (0, 1, 6.0)],
+    ],
+)
+def test_try_acquire(clock, steps):
+    limiter = AsyncRateLimiter(10, time_period=60)
+
+    for passed, amount, delay in steps:
+        clock.now += passed
+        assert limiter._try_acquire(amount) == pytest.approx(delay)
+
+
+@pytest.mark.parametrize(
+    ("headers", "delay"),
+    [
+        ({"x-ratelimit-remaining-requests": "2", "x-ratelimit-reset-requests": "20ms"}, 0.02),
+        ({"x-ratelimit-remaining-requests": "0", "x-ratelimit-reset-requests": "6s"}, 6.0),
+        ({"x-ratelimit-remaining-requests": "2"}, DEFAULT_RESET_SECONDS),
+        ({"x-ratelimit-remaining-requests": "100", "x-ratelimit-reset-requests": "6s"}, 0.0),
+        ({"x-ratelimit-remaining-requests": "unknown"}, 0.0),
+        ({}, 0.0),
+    ],
+)
+def test_update_from_headers_pauses(clock, headers, delay):
+    limiter = AsyncRateLimiter(10, time_period=60)
+
+    limiter.update_from_headers(headers)
+
+    assert limiter._try_acquire(1) == pytest.approx(delay)
@@ -0,0 +1,92 @@
+import pytest
+
+from ai_code_guard import summarize_project
+from ai_code_guard.summarize_project import RepoFileAnalyzer, classify_by_name
+
+
+@pytest.mark.parametrize(
+    ("file_path", "category"),
+    [
+        ("README.md", "documentation_files"),
+        ("docs/Readme", "documentation_files"),
+        ("readme.txt", "documentation_files"),
+        ("docs/guide.rst", "documentation_files"),
+        ("requirements.txt", "dependency_files"),
+        ("requirements-dev.in", "dependency_files"),
+        ("backend/pyproject.toml", "dependency_files"),
+        ("setup.py", "dependency_files"),
+        ("readme.py", ""),
+        ("tools/readme_generator.py", ""),
+        ("src/app.ts", ""),
+        ("config.yaml", None),
+        ("Dockerfile", None),
+    ],
+)
+def test_classify_by_name(file_path, category):
+    assert classify_by_name(file_path) == category
+
+
+@pytest.fixture
+def analyzer(monkeypatch):
+    # One token per character keeps the batch sizes independent of the tokenizer
+    monkeypatch.setattr(summarize_project, "count_path_tokens", len)
+    return RepoFileAnalyzer(max_input_tokens=10)
+
+
+# Every one-character path takes 1 + PATH_OVERHEAD_TOKENS = 5 tokens of the budget of 10
+@pytest.mark.parametrize(
+    ("file_paths", "batches"),
+    [
+        ([], []),
+        (["a"], [["a"]]),
+        (["a", "b"], [["a", "b"]]),
+        (["a", "b", "c"], [["a", "b"], ["c"]]),
+        (["a", "b", "c", "d", "e"], [["a", "b"], ["c", "d"], ["e"]]),
+        (["long/path.txt", "a"], [["long/path.txt"], ["a"]]),
+        (["a", "long/path.txt", "b"], [["a"], ["long/path.txt"], ["b"]]),
+    ],
+)
+def test_split_batches(analyzer, file_paths, batches):
+    assert analyzer._split_batches(file_paths) == batches
+
+
+def _batch(documentation_files, dependency_files):
+    return True, {"documentation_files": documentation_files, "dependency_files": dependency_files}
+
+
+def _failed(error):
+    return False, {"documentation_files": [], "dependency_files": [], "error": error}
+
+
+@pytest.mark.parametrize(
+    ("batch_results", "merged", "messages"),
+    [
+        ([], {"documentation_files": [], "dependency_files": []}, []),
+        (
+            [_batch(["README.md"], ["requirements.txt"]), _batch(["docs/a.md"], [])],
+            {"documentation_files": ["README.md", "docs/a.md"],
+             "dependency_files": ["requirements.txt"]},
+            [],
+        ),
+        (
+            [_batch(["b.md", "a.md"], []), _batch(["a.md", "c.md"], [])],
+            {"documentation_files": ["b.md", "a.md", "c.md"], "dependency_files": []},
+            [],
+        ),
+        (
+            [_batch(["README.md"], []), _failed("timeout"), _batch([], ["setup.py"])],
+            {"documentation_files": ["README.md"], "dependency_files": ["setup.py"]},
+            ["\nSkipping failed batch: timeout"],
+        ),
+        (
+            [_failed("invalid JSON")],
+            {"documentation_files": [], "dependency_files": []},
+            ["\nSkipping failed batch: invalid JSON"],
+        ),
+    ],
+)
+def test_merge_results(batch_results, merged, messages):
+    progress = []
+
+    assert RepoFileAnalyzer._merge_results(batch_results, progress.append) == merged
+    assert progress == messages